@@ -1,16 +1,43 @@
 import argparse
 import asyncio
+import hashlib
+import hmac
+import io
+import json
+import multiprocessing
+import operator
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
 
 import aioboto3
+import aiofiles
 import obstore as obs
-from httpx import AsyncClient
+import pyarrow.parquet as pq
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
+from httpx import AsyncClient, Limits
 from aioaws.s3 import S3Client as AioAwsS3Client, S3Config as AioAwsS3Config
 from obstore.store import S3Store
 
+# obstore returns homogeneously typed entries -- dicts in older versions,
+# ObjectMeta in newer ones -- so the accessor branch is decided once at
+# import instead of once per listed object.
+_OBSTORE_NEW = hasattr(obs.store, "ObjectMeta")
+_get_path = (
+    operator.attrgetter("path") if _OBSTORE_NEW else operator.itemgetter("path")
+)
+_get_size = (
+    operator.attrgetter("size") if _OBSTORE_NEW else operator.itemgetter("size")
+)
+
 # --------- CONFIG FROM ENV ---------
 AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
@@ -19,9 +46,224 @@ AWS_REGION = os.getenv("AWS_REGION", "eu-west-1")
 # Bucket where you have at least List/Get permission.
 S3_TEST_BUCKET = os.getenv("S3_TEST_BUCKET", "auto-product-build-downstream").strip()
 
+# Optional key prefix to restrict listings.  Normalized to end with '/'
+# so S3 can treat it as a directory boundary, which is far cheaper than
+# an open-ended prefix scan.
+S3_LIST_PREFIX = os.getenv("S3_LIST_PREFIX", "").strip()
+if S3_LIST_PREFIX and not S3_LIST_PREFIX.endswith("/"):
+    S3_LIST_PREFIX += "/"
+
 # Default maximum number of objects to list per interface
 DEFAULT_MAX_ITEMS = int(os.getenv("S3_LIST_LIMIT", "100"))
 
+# How many object downloads may be in flight at once per interface
+DOWNLOAD_CONCURRENCY = int(os.getenv("S3_DOWNLOAD_CONCURRENCY", "32"))
+
+# Cached STS identity: skips the GetCallerIdentity round trip (a cold
+# TLS handshake before any useful work) on repeated runs within the TTL.
+STS_CACHE_PATH = Path.home() / ".cache" / "async-aws-s3" / "sts.json"
+STS_CACHE_TTL = 3600  # seconds
+
+# Set to "1" to route the aioboto3 downloads through the SDK's transfer
+# manager instead of the inline-signed GET path below (kept around for
+# comparison; the SDK adds per-call event/serialization overhead that
+# dominates for small objects).
+S3_SDK_DOWNLOAD = os.getenv("S3_SDK_DOWNLOAD", "0") == "1"
+
+# Runs requesting more than this many objects shard the aioboto3 phase
+# across one worker process per CPU, each with its own event loop, so
+# GIL-serialized TLS decryption and per-file syscalls stop being the
+# bottleneck.  Small jobs stay in-process to avoid fork/spawn overhead.
+SHARD_THRESHOLD = int(os.getenv("S3_SHARD_THRESHOLD", "10000"))
+
+# Objects above this size are fetched as parallel ranged GETs; a single
+# GET stream is capped by the TCP window to one S3 frontend, ranged GETs
+# spread the object across several.
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+
+# Cap on concurrent ranged GETs per object, for both the SDK transfer
+# manager and the hand-signed paths; without it a multi-GiB object
+# spawns one task per 8 MiB slice all at once.
+PART_CONCURRENCY = 16
+
+# Read bodies in 8 MiB steps to match S3's TCP window and amortize the
+# per-chunk allocation and syscall overhead of a small read size.
+READ_CHUNKSIZE = 8 * 1024 * 1024
+
+# Objects up to this size are multiplexed over the HTTP/2 client (many
+# GETs share one TLS connection); bigger bodies go over HTTP/1.1, where
+# each gets its own connection and no head-of-line blocking.
+SMALL_OBJECT_LIMIT = 256 * 1024
+
+# Tuned botocore client config: a connection pool sized for the
+# concurrent downloads (the default 10 would gate them), adaptive
+# retries that smooth throttling under concurrency, and TCP keepalive
+# so NAT/idle timeouts don't kill long streams.
+_BOTO_CONFIG = BotoConfig(
+    max_pool_connections=128,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=60,
+)
+
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_CHUNKSIZE,
+    max_concurrency=PART_CONCURRENCY,
+)
+
+# Shared httpx client for everything aioaws does.  Keep-alive means only
+# the first request to s3.amazonaws.com pays the TLS handshake and TCP
+# slow-start; later calls reuse warm pooled connections.  Closed at the
+# end of main().
+_HTTP = AsyncClient(
+    timeout=60,
+    limits=Limits(
+        max_keepalive_connections=100,
+        max_connections=100,
+        keepalive_expiry=60,
+    ),
+    http2=True,
+)
+
+# HTTP/1.1-only twin of _HTTP for large body streams, which suffer from
+# HTTP/2 head-of-line blocking when multiplexed.
+_HTTP1 = AsyncClient(
+    timeout=60,
+    limits=Limits(
+        max_keepalive_connections=100,
+        max_connections=100,
+        keepalive_expiry=60,
+    ),
+)
+
+# One aioboto3 session for the whole program; sessions memoize credential
+# resolution, so there is no reason to rebuild one per phase.
+_SESSION = aioboto3.Session(
+    aws_access_key_id=AWS_ACCESS_KEY_ID,
+    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+    region_name=AWS_REGION,
+)
+
+
+@asynccontextmanager
+async def s3_client():
+    """
+    Hold one aioboto3 S3 client open for the caller's lifetime.
+
+    Opening a client pays endpoint resolution, the credential chain walk
+    and a cold connection pool, so main() opens it once and passes it to
+    both the list and download phases instead of each opening its own.
+    """
+    async with _SESSION.client("s3", config=_BOTO_CONFIG) as s3:
+        yield s3
+
+
+# One obstore S3Store for the whole program, built lazily because the
+# bucket name may be unset (callers guard on S3_TEST_BUCKET first).
+_STORE: Optional[S3Store] = None
+
+
+def _obstore_store() -> S3Store:
+    global _STORE
+    if _STORE is None:
+        _STORE = S3Store(
+            bucket=S3_TEST_BUCKET,
+            prefix="",
+            region=AWS_REGION,
+        )
+    return _STORE
+
+
+def _aioaws_client() -> AioAwsS3Client:
+    """Build an aioaws S3 client on top of the shared httpx client."""
+    return AioAwsS3Client(
+        _HTTP,
+        AioAwsS3Config(
+            AWS_ACCESS_KEY_ID,
+            AWS_SECRET_ACCESS_KEY,
+            AWS_REGION,
+            S3_TEST_BUCKET,
+        ),
+    )
+
+
+# --------------------------------------------------------------------
+# Minimal SigV4 signing for plain object GETs
+# --------------------------------------------------------------------
+# For a bare `GET /{key}` the SDK's event system, waiter model and
+# model-driven serialization are all overhead; signing the request by
+# hand is four HMAC-SHA256 calls (C-fast via OpenSSL) plus one for the
+# string-to-sign, and the request then rides the shared httpx pool.
+_EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+
+def _s3_host() -> str:
+    return f"{S3_TEST_BUCKET}.s3.{AWS_REGION}.amazonaws.com"
+
+
+@lru_cache(maxsize=8)
+def _signing_key(secret_key: str, date_stamp: str, region: str) -> bytes:
+    """
+    Derive the SigV4 signing key for (secret, date, region, s3).
+
+    The key only changes with the credentials, UTC date or region, so it
+    is memoized: a burst of N GETs pays the four-HMAC derivation chain
+    once and each request only computes the final signature HMAC.
+    """
+    k_date = hmac.new(
+        ("AWS4" + secret_key).encode(), date_stamp.encode(), hashlib.sha256
+    ).digest()
+    k_region = hmac.new(k_date, region.encode(), hashlib.sha256).digest()
+    k_service = hmac.new(k_region, b"s3", hashlib.sha256).digest()
+    return hmac.new(k_service, b"aws4_request", hashlib.sha256).digest()
+
+
+def _signed_get(key: str) -> Tuple[str, Dict[str, str]]:
+    """Build the URL and SigV4 headers for a GET of one object."""
+    now = datetime.now(timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date_stamp = now.strftime("%Y%m%d")
+    host = _s3_host()
+
+    canonical_uri = "/" + quote(key, safe="/-_.~")
+    canonical_headers = (
+        f"host:{host}\n"
+        f"x-amz-content-sha256:{_EMPTY_SHA256}\n"
+        f"x-amz-date:{amz_date}\n"
+    )
+    signed_headers = "host;x-amz-content-sha256;x-amz-date"
+    canonical_request = "\n".join(
+        ["GET", canonical_uri, "", canonical_headers, signed_headers, _EMPTY_SHA256]
+    )
+
+    scope = f"{date_stamp}/{AWS_REGION}/s3/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+    signature = hmac.new(
+        _signing_key(AWS_SECRET_ACCESS_KEY, date_stamp, AWS_REGION),
+        string_to_sign.encode(),
+        hashlib.sha256,
+    ).hexdigest()
+
+    headers = {
+        "x-amz-date": amz_date,
+        "x-amz-content-sha256": _EMPTY_SHA256,
+        "Authorization": (
+            f"AWS4-HMAC-SHA256 Credential={AWS_ACCESS_KEY_ID}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        ),
+    }
+    return f"https://{host}{canonical_uri}", headers
+
 
 def _require_creds() -> None:
     missing = [
@@ -37,69 +279,79 @@ def _require_creds() -> None:
         sys.exit(1)
 
 
-def _is_downloadable_entry(entry) -> bool:
-    """
-    Decide whether this entry represents a real S3 object (not a prefix).
-
-    Handles:
-      - aioboto3 dicts: {"Key": "...", "Size": 0/whatever}
-      - aioaws ObjectMeta: obj.key, obj.size
-      - obstore dicts: {"path": "...", "size": ...}
-      - obstore ObjectMeta: entry.path, entry.size
-      - plain key strings: "foo/bar/baz"
-    """
-    # 0. plain string key
-    if isinstance(entry, str):
-        # S3 "folders" are conventionally keys ending with '/'
-        return not entry.endswith("/")
-
-    # 1. aioboto3 paginator dict
-    if isinstance(entry, dict) and "Key" in entry:
-        key = entry["Key"]
-        size = entry.get("Size", None)
-        return not key.endswith("/") and (size is None or size > 0)
-
-    # 2. aioaws ObjectMeta (or similar)
-    if hasattr(entry, "key") and hasattr(entry, "size"):
-        return not entry.key.endswith("/") and entry.size > 0
-
-    # 3. obstore dict format
-    if isinstance(entry, dict) and "path" in entry:
-        key = entry.get("path")
-        size = entry.get("size", None)
-        return (
-            key is not None
-            and not key.endswith("/")
-            and (size is None or size > 0)
-        )
+# Each caller knows which SDK produced its entries, so the filters below
+# are specialized per listing path instead of probing types per object.
+# S3 "folders" are conventionally zero-byte keys ending with '/'.
+def _is_dl_boto(obj: dict) -> bool:
+    """aioboto3 list_objects_v2 dict: {"Key": ..., "Size": ...}."""
+    size = obj.get("Size")
+    return not obj["Key"].endswith("/") and (size is None or size > 0)
+
 
-    # 4. obstore ObjectMeta
-    if hasattr(entry, "path") and hasattr(entry, "size"):
-        return not entry.path.endswith("/") and entry.size > 0
+def _is_dl_aioaws(obj) -> bool:
+    """aioaws ObjectMeta with .key and .size."""
+    return not obj.key.endswith("/") and obj.size > 0
 
-    return False
+
+def _is_dl_obstore(key: str, size) -> bool:
+    """obstore entry with path and size already extracted by the loop."""
+    return not key.endswith("/") and (size is None or size > 0)
 
 
 # --------------------------------------------------------------------
 # aioboto3: check *authentication only* via STS.GetCallerIdentity
 # --------------------------------------------------------------------
+def _load_sts_cache() -> Optional[dict]:
+    """
+    Return the cached STS identity if it is fresher than the TTL and
+    belongs to the current access key; anything else is a miss, so
+    switching credentials always revalidates against STS.
+    """
+    try:
+        if time.time() - STS_CACHE_PATH.stat().st_mtime < STS_CACHE_TTL:
+            cached = json.loads(STS_CACHE_PATH.read_text())
+            if cached.get("AccessKeyId") == AWS_ACCESS_KEY_ID:
+                return cached
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _save_sts_cache(resp: dict) -> None:
+    try:
+        STS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        cached = {k: resp[k] for k in ("Account", "Arn", "UserId")}
+        cached["AccessKeyId"] = AWS_ACCESS_KEY_ID
+        STS_CACHE_PATH.write_text(json.dumps(cached))
+    except OSError:
+        pass  # a failed cache write should never break the check
+
+
 async def check_aioboto3_sts() -> None:
     """
     Cleanest way to check that credentials are valid:
     STS.GetCallerIdentity doesn't require any S3 permissions.
+
+    The identity is cached on disk for an hour so repeated runs skip
+    the round trip entirely.
     """
     print("\n=== aioboto3: STS GetCallerIdentity ===")
-    session = aioboto3.Session(
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION,
-    )
-    async with session.client("sts") as sts:
+
+    cached = _load_sts_cache()
+    if cached is not None:
+        print("  Account :", cached["Account"])
+        print("  ARN     :", cached["Arn"])
+        print("  UserId  :", cached["UserId"])
+        print("  -> aioboto3 credentials are valid (cached)")
+        return
+
+    async with _SESSION.client("sts", config=_BOTO_CONFIG) as sts:
         resp = await sts.get_caller_identity()
         print("  Account :", resp["Account"])
         print("  ARN     :", resp["Arn"])
         print("  UserId  :", resp["UserId"])
         print("  -> aioboto3 credentials are valid")
+        _save_sts_cache(resp)
 
 
 # --------------------------------------------------------------------
@@ -112,31 +364,22 @@ async def check_aioaws_s3() -> None:
         print("  S3_TEST_BUCKET not set; skipping aioaws S3 check.")
         return
 
-    async with AsyncClient(timeout=10) as http_client:
-        s3 = AioAwsS3Client(
-            http_client,
-            AioAwsS3Config(
-                AWS_ACCESS_KEY_ID,
-                AWS_SECRET_ACCESS_KEY,
-                AWS_REGION,
-                S3_TEST_BUCKET,
-            ),
-        )
+    s3 = _aioaws_client()
 
-        try:
-            count = 0
-            async for obj in s3.list():
-                # obj has `.key` for the S3 object key
-                print("  First key from list():", obj.key)
-                count += 1
-                if count >= 1:
-                    break
+    try:
+        count = 0
+        async for obj in s3.list():
+            # obj has `.key` for the S3 object key
+            print("  First key from list():", obj.key)
+            count += 1
+            if count >= 1:
+                break
 
-            if count == 0:
-                print("  list() returned no objects, but request was accepted.")
-            print("  -> aioaws S3 request signed & accepted")
-        except Exception as e:
-            print("  aioaws S3 call failed:", repr(e))
+        if count == 0:
+            print("  list() returned no objects, but request was accepted.")
+        print("  -> aioaws S3 request signed & accepted")
+    except Exception as e:
+        print("  aioaws S3 call failed:", repr(e))
 
 
 # --------------------------------------------------------------------
@@ -149,12 +392,8 @@ async def check_obstore_s3() -> None:
         print("  S3_TEST_BUCKET not set; skipping obstore S3 check.")
         return
 
-    # S3Store will read creds from env; we pass region explicitly.
-    store = S3Store(
-        bucket=S3_TEST_BUCKET,
-        prefix="",  # list from bucket root
-        region=AWS_REGION,
-    )
+    # S3Store will read creds from env; region is passed at construction.
+    store = _obstore_store()
 
     try:
         # list_async() yields *batches* (Sequence[ObjectMeta] or Sequence[dict])
@@ -165,16 +404,7 @@ async def check_obstore_s3() -> None:
                 continue
 
             first = batch[0]
-
-            # Handle both older dict-based and newer ObjectMeta-based APIs
-            if isinstance(first, dict):
-                # Older API: dict with "path" / "size" etc.
-                name = first.get("path") or first
-            else:
-                # Newer API: ObjectMeta with `.path`
-                name = getattr(first, "path", str(first))
-
-            print("  First path from list_async():", name)
+            print("  First path from list_async():", _get_path(first))
             print("  -> obstore S3 request signed & accepted")
             break
 
@@ -191,261 +421,556 @@ async def check_obstore_s3() -> None:
             print("  obstore S3 call failed:", msg)
 
 
+async def _as_entries(
+    rows: List[Tuple[str, int]]
+) -> AsyncIterator[Tuple[str, int]]:
+    """Adapt an in-memory row list to the (key, size) stream interface."""
+    for row in rows:
+        yield row
+
+
+# --------------------------------------------------------------------
+# S3 Inventory: read the object catalog from a manifest instead of LIST
+# --------------------------------------------------------------------
+async def load_inventory(s3, manifest_url: str) -> List[Tuple[str, int]]:
+    """
+    Load (key, size) rows from an S3 Inventory manifest.
+
+    For slowly changing buckets the daily inventory replaces one LIST
+    request per 1000 objects with a local Parquet scan: the manifest
+    JSON names the shard files, and pyarrow reads just the key and size
+    columns out of each.
+    """
+    bucket, _, manifest_key = manifest_url.removeprefix("s3://").partition("/")
+    print(f"\n=== inventory: loading manifest s3://{bucket}/{manifest_key} ===")
+
+    resp = await s3.get_object(Bucket=bucket, Key=manifest_key)
+    async with resp["Body"] as body:
+        manifest = json.loads(await body.read())
+
+    # destinationBucket is an ARN like arn:aws:s3:::my-bucket
+    dest_bucket = manifest["destinationBucket"].rpartition(":::")[2]
+
+    rows: List[Tuple[str, int]] = []
+    for shard in manifest["files"]:
+        resp = await s3.get_object(Bucket=dest_bucket, Key=shard["key"])
+        async with resp["Body"] as body:
+            data = await body.read()
+        table = pq.read_table(io.BytesIO(data), columns=["key", "size"])
+        # Inventory stores keys URL-encoded, and it includes directory
+        # markers; decode and keep only real files, like the listing
+        # generators do.
+        for raw_key, size in zip(
+            table.column("key").to_pylist(),
+            table.column("size").to_pylist(),
+        ):
+            key = unquote(raw_key)
+            if not key.endswith("/") and (size is None or size > 0):
+                # null Parquet sizes become 0 so the downloaders'
+                # size comparisons never see None
+                rows.append((key, size or 0))
+
+    print(f"  -> inventory holds {len(rows)} objects")
+    return rows
+
+
 # --------------------------------------------------------------------
 # Full listings with a configurable max_items
 # --------------------------------------------------------------------
-async def list_aioboto3_contents(max_items: int = 100) -> List[str]:
+async def list_aioboto3_contents(
+    s3, max_items: int = 100, shallow: bool = False
+) -> AsyncIterator[Tuple[str, int]]:
     print(
         f"\n=== aioboto3: listing up to {max_items} objects (Downloading only files) "
         f"from bucket {S3_TEST_BUCKET!r} ==="
     )
     if not S3_TEST_BUCKET:
         print("  S3_TEST_BUCKET not set; skipping.")
-        return []
-
-    session = aioboto3.Session(
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION,
-    )
-
-    keys: List[str] = []
-
-    async with session.client("s3") as s3:
-        paginator = s3.get_paginator("list_objects_v2")
-        count = 0
-
-        async for page in paginator.paginate(Bucket=S3_TEST_BUCKET):
-            contents = page.get("Contents", [])
-            for obj in contents:
-                key = obj["Key"]
-                print("  -", key)
-
-                # only collect real files
-                if _is_downloadable_entry(obj):
-                    keys.append(key)
+        return
 
-                count += 1
-                if count >= max_items:
-                    break
+    paginator = s3.get_paginator("list_objects_v2")
+    count = 0
+    files = 0
+
+    paginate_kwargs = {
+        "Bucket": S3_TEST_BUCKET,
+        "Prefix": S3_LIST_PREFIX,
+        # Ask S3 for exactly what we need: never more than max_items in
+        # total, and pages no bigger than the remaining budget, so a
+        # small --limit doesn't pull 1000 keys off the wire per page.
+        "PaginationConfig": {
+            "PageSize": min(max_items, 1000),
+            "MaxItems": max_items,
+        },
+    }
+    if shallow:
+        # Delimiter folds each subdirectory into a single CommonPrefixes
+        # row, so S3 only walks the top-level entries.
+        paginate_kwargs["Delimiter"] = "/"
+
+    async for page in paginator.paginate(**paginate_kwargs):
+        contents = page.get("Contents", [])
+        listed: List[str] = []
+        for obj in contents:
+            key = obj["Key"]
+            listed.append(key)
+
+            # only yield real files; carry the size through so the
+            # downloaders can preallocate
+            if _is_dl_boto(obj):
+                files += 1
+                yield key, obj.get("Size", 0)
+
+            count += 1
             if count >= max_items:
                 break
+        # One write per page instead of a print (and a stdout lock +
+        # flush) per key; flushing per page keeps memory off O(bucket).
+        sys.stdout.write("".join(f"  - {k}\n" for k in listed))
+        if count >= max_items:
+            break
 
-        print(
-            f"  -> aioboto3 listed {count} objects (limit {max_items}), "
-            f"{len(keys)} of them are downloadable files."
-        )
-
-    return keys
+    print(
+        f"  -> aioboto3 listed {count} objects (limit {max_items}), "
+        f"{files} of them are downloadable files."
+    )
 
 
-async def list_aioaws_contents(max_items: int = 100) -> List[str]:
+async def list_aioaws_contents(
+    max_items: int = 100, shallow: bool = False
+) -> AsyncIterator[Tuple[str, int]]:
     print(
         f"\n=== aioaws: listing up to {max_items} objects (Downloading only files) "
         f"from bucket {S3_TEST_BUCKET!r} ==="
     )
     if not S3_TEST_BUCKET:
         print("  S3_TEST_BUCKET not set; skipping.")
-        return []
+        return
 
-    keys: List[str] = []
+    s3 = _aioaws_client()
 
-    async with AsyncClient(timeout=30) as http_client:
-        s3 = AioAwsS3Client(
-            http_client,
-            AioAwsS3Config(
-                AWS_ACCESS_KEY_ID,
-                AWS_SECRET_ACCESS_KEY,
-                AWS_REGION,
-                S3_TEST_BUCKET,
-            ),
-        )
-
-        count = 0
-        try:
-            async for obj in s3.list():
-                print("  -", obj.key)
+    count = 0
+    files = 0
+    listed: List[str] = []
+    try:
+        async for obj in s3.list(S3_LIST_PREFIX or None):
+            # aioaws has no delimiter support, so shallow mode drops
+            # nested keys client-side before they are counted.
+            if shallow and "/" in obj.key[len(S3_LIST_PREFIX):]:
+                continue
 
-                # only collect real files
-                if _is_downloadable_entry(obj):
-                    keys.append(obj.key)
+            listed.append(obj.key)
+            # aioaws exposes no page boundary, so flush the batched
+            # output every 1000 keys to keep memory off O(bucket)
+            if len(listed) >= 1000:
+                sys.stdout.write("".join(f"  - {k}\n" for k in listed))
+                listed.clear()
 
-                count += 1
-                if count >= max_items:
-                    break
+            # only yield real files; carry the size through so the
+            # downloaders can preallocate
+            if _is_dl_aioaws(obj):
+                files += 1
+                yield obj.key, obj.size
 
-            print(
-                f"  -> aioaws listed {count} objects (limit {max_items}), "
-                f"{len(keys)} of them are downloadable files."
-            )
-        except Exception as e:
-            print("  aioaws bucket listing failed:", e)
+            count += 1
+            if count >= max_items:
+                break
 
-    return keys
+        sys.stdout.write("".join(f"  - {k}\n" for k in listed))
+        print(
+            f"  -> aioaws listed {count} objects (limit {max_items}), "
+            f"{files} of them are downloadable files."
+        )
+    except Exception as e:
+        print("  aioaws bucket listing failed:", e)
 
 
-async def list_obstore_contents(max_items: int = 100) -> List[str]:
+async def list_obstore_contents(
+    max_items: int = 100, shallow: bool = False
+) -> AsyncIterator[Tuple[str, int]]:
     print(
         f"\n=== obstore: listing up to {max_items} objects (Downloading only files) "
         f"from bucket {S3_TEST_BUCKET!r} ==="
     )
     if not S3_TEST_BUCKET:
         print("  S3_TEST_BUCKET not set; skipping.")
-        return []
+        return
 
-    store = S3Store(
-        bucket=S3_TEST_BUCKET,
-        prefix="",
-        region=AWS_REGION,
-    )
+    store = _obstore_store()
+
+    async def _batches():
+        if shallow:
+            # list_with_delimiter folds subdirectories into
+            # common_prefixes; only top-level objects come back.
+            res = await obs.list_with_delimiter_async(
+                store, prefix=S3_LIST_PREFIX
+            )
+            yield res["objects"] if isinstance(res, dict) else res.objects
+        else:
+            # Size batches to the remaining budget so a small --limit
+            # doesn't drain a full default-sized page off the wire.
+            async for batch in store.list_async(
+                prefix=S3_LIST_PREFIX, chunk_size=min(max_items, 1000)
+            ):
+                yield batch
 
-    keys: List[str] = []
     count = 0
+    files = 0
     try:
-        async for batch in store.list_async(prefix=""):
+        async for batch in _batches():
+            listed: List[str] = []
             for entry in batch:
-                if isinstance(entry, dict):
-                    name = entry.get("path") or entry
-                else:
-                    name = getattr(entry, "path", str(entry))
-
-                key = str(name)
-                print("  -", key)
+                key = str(_get_path(entry))
+                size = _get_size(entry)
+                listed.append(key)
 
-                # only collect real files
-                if _is_downloadable_entry(entry):
-                    keys.append(key)
+                # only yield real files; prefixes are dropped here in
+                # the list loop and never reach the downloader
+                if _is_dl_obstore(key, size):
+                    files += 1
+                    yield key, size or 0
 
                 count += 1
                 if count >= max_items:
                     break
+            # one write per batch; keeps memory off O(bucket)
+            sys.stdout.write("".join(f"  - {k}\n" for k in listed))
             if count >= max_items:
                 break
 
         print(
             f"  -> obstore listed {count} objects (limit {max_items}), "
-            f"{len(keys)} of them are downloadable files."
+            f"{files} of them are downloadable files."
         )
     except Exception as e:
         print("  obstore bucket listing failed:", e)
 
-    return keys
-
 
 # --------------------------------------------------------------------
 # Downloads for each interface
 # --------------------------------------------------------------------
-async def download_aioboto3_files(keys: List[str], outdir: Path) -> None:
+def _ensure_parent(path: Path, seen: set) -> None:
+    """Create each distinct parent directory once per run, not per key.
+
+    Most keys share an already-created parent, so this turns a stat +
+    mkdir per file into one mkdir per unique directory.
+    """
+    parent = path.parent
+    if parent not in seen:
+        parent.mkdir(parents=True, exist_ok=True)
+        seen.add(parent)
+
+
+async def _pipeline(
+    entries: AsyncIterator[Tuple[str, int]], fetch
+) -> None:
+    """
+    Feed (key, size) entries into a bounded queue drained by
+    DOWNLOAD_CONCURRENCY worker tasks.
+
+    The listing generator keeps paginating while the workers download,
+    so the first transfer starts long before the last page arrives and
+    peak memory stays O(queue depth) instead of O(bucket).  Each fetch
+    handles its own errors, so a failed object never stalls the pool.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1024)
+
+    async def _worker() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            await fetch(*item)
+
+    workers = [
+        asyncio.create_task(_worker()) for _ in range(DOWNLOAD_CONCURRENCY)
+    ]
+    async for entry in entries:
+        await queue.put(entry)
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+
+
+async def download_aioboto3_files(
+    s3, entries: AsyncIterator[Tuple[str, int]], outdir: Path
+) -> None:
     base = outdir / "aioboto3"
     base.mkdir(parents=True, exist_ok=True)
-    print(f"\n=== aioboto3: downloading {len(keys)} objects into {base} ===")
+    print(f"\n=== aioboto3: downloading listed objects into {base} ===")
 
-    if not keys:
-        print("  (no keys to download)")
-        return
+    # The client passed in is shared by all in-flight downloads (and with
+    # the earlier list phase) so its HTTP connection pool stays warm.
+    # A per-file print would serialize the event loop on stdout, so only
+    # a progress line every 100 files is emitted.
+    done = 0
+    seen_dirs = {base}
 
-    session = aioboto3.Session(
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION,
+    async def _fetch(key: str, size: int) -> None:
+        nonlocal done
+        local_path = base / key
+
+        try:
+            # inside the try: a conflicting path (e.g. keys `a` and
+            # `a/b` in one bucket) must fail this object, not the worker
+            _ensure_parent(local_path, seen_dirs)
+            if S3_SDK_DOWNLOAD:
+                # download_file delegates to the S3 transfer manager,
+                # which splits objects above MULTIPART_THRESHOLD into
+                # parallel ranged GETs instead of one capped stream.
+                await s3.download_file(
+                    S3_TEST_BUCKET, key, str(local_path), Config=_TRANSFER_CONFIG
+                )
+            elif size > MULTIPART_THRESHOLD:
+                # Hot path, large object: the same parallel ranged GETs
+                # the transfer manager would issue, but signed by hand.
+                # Range is not in SignedHeaders, so one signature covers
+                # every slice; each lands at its offset via pwrite.
+                url, headers = _signed_get(key)
+                with open(local_path, "wb") as f:
+                    fd = f.fileno()
+                    await asyncio.to_thread(os.posix_fallocate, fd, 0, size)
+                    sem = asyncio.Semaphore(PART_CONCURRENCY)
+
+                    async def _part(offset: int) -> None:
+                        async with sem:
+                            end = min(offset + MULTIPART_CHUNKSIZE, size) - 1
+                            resp = await _HTTP1.get(
+                                url,
+                                headers={
+                                    **headers,
+                                    "Range": f"bytes={offset}-{end}",
+                                },
+                            )
+                            resp.raise_for_status()
+                            await asyncio.to_thread(
+                                os.pwrite, fd, resp.content, offset
+                            )
+
+                    # TaskGroup, not gather: a failed part must cancel
+                    # its siblings and only raise once they have all
+                    # settled, so no straggler can pwrite into this fd
+                    # after the file closes and the number is reused.
+                    async with asyncio.TaskGroup() as tg:
+                        for offset in range(0, size, MULTIPART_CHUNKSIZE):
+                            tg.create_task(_part(offset))
+                    os.posix_fadvise(fd, 0, size, os.POSIX_FADV_DONTNEED)
+            else:
+                # Hot path, small object: sign the GET by hand and
+                # stream it over the shared httpx pool, skipping the
+                # SDK's per-call dispatch and serialization machinery.
+                # The smallest objects multiplex on the HTTP/2
+                # connection; the rest take a dedicated HTTP/1.1 one.
+                client = _HTTP if size <= SMALL_OBJECT_LIMIT else _HTTP1
+                url, headers = _signed_get(key)
+                async with client.stream("GET", url, headers=headers) as resp:
+                    resp.raise_for_status()
+                    async with aiofiles.open(local_path, "wb") as f:
+                        fd = f.fileno()
+                        if size > 0:
+                            await asyncio.to_thread(
+                                os.posix_fallocate, fd, 0, size
+                            )
+                        async for chunk in resp.aiter_raw(READ_CHUNKSIZE):
+                            await f.write(chunk)
+                        await f.flush()
+                        os.posix_fadvise(fd, 0, size, os.POSIX_FADV_DONTNEED)
+            done += 1
+            if done % 100 == 0:
+                print(f"  ... {done} downloaded")
+        except Exception as e:
+            print(f"  FAILED to download {key!r} via aioboto3:", e)
+
+    await _pipeline(entries, _fetch)
+    print(f"  -> aioboto3 downloaded {done} files into {base}")
+
+
+async def _download_shard(
+    shard: List[Tuple[str, int]], outdir: Path
+) -> None:
+    try:
+        async with s3_client() as s3:
+            await download_aioboto3_files(s3, _as_entries(shard), outdir)
+    finally:
+        await _HTTP.aclose()
+        await _HTTP1.aclose()
+
+
+def _run_shard(shard: List[Tuple[str, int]], outdir: str) -> None:
+    """Entry point for one worker process: drain its shard of keys."""
+    asyncio.run(_download_shard(shard, Path(outdir)))
+
+
+async def download_aioboto3_sharded(
+    entries: AsyncIterator[Tuple[str, int]], outdir: Path
+) -> None:
+    """
+    Drain the listing and download it with one worker process per CPU.
+
+    Each worker runs its own event loop over a round-robin shard of the
+    keys, so TLS decryption and file writes spread across cores instead
+    of contending for one GIL.  Worth the fork overhead only for large
+    jobs; main() picks this path when the requested limit exceeds
+    SHARD_THRESHOLD.
+    """
+    keys = [entry async for entry in entries]
+    n_workers = os.cpu_count() or 1
+    shards = [s for s in (keys[i::n_workers] for i in range(n_workers)) if s]
+    print(
+        f"\n=== aioboto3: downloading {len(keys)} objects in "
+        f"{len(shards)} worker processes ==="
     )
 
-    async with session.client("s3") as s3:
-        for key in keys:
-            # keys list already filtered, but keep a cheap guard
-            if not _is_downloadable_entry(key):
-                continue
+    loop = asyncio.get_running_loop()
+    # spawn, not fork: forked children would inherit the parent's live
+    # _HTTP/_HTTP1 clients and their open TLS sockets, and closing them
+    # in a worker tears down connections the parent and sibling workers
+    # still use.  A spawned worker imports the module fresh and builds
+    # its own clients.
+    with ProcessPoolExecutor(
+        max_workers=len(shards) or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, _run_shard, shard, str(outdir))
+                for shard in shards
+            )
+        )
+
 
-            local_path = base / key
-            local_path.parent.mkdir(parents=True, exist_ok=True)
-
-            try:
-                resp = await s3.get_object(Bucket=S3_TEST_BUCKET, Key=key)
-                body = resp["Body"]
-                # aiobotocore-style streaming body
-                async with body:
-                    with open(local_path, "wb") as f:
-                        while True:
-                            chunk = await body.read(1 * 1024 * 1024)
-                            if not chunk:
-                                break
-                            f.write(chunk)
-                print(f"  downloaded: {key} -> {local_path}")
-            except Exception as e:
-                print(f"  FAILED to download {key!r} via aioboto3:", e)
-
-
-async def download_aioaws_files(keys: List[str], outdir: Path) -> None:
+async def download_aioaws_files(
+    entries: AsyncIterator[Tuple[str, int]], outdir: Path
+) -> None:
     base = outdir / "aioaws"
     base.mkdir(parents=True, exist_ok=True)
-    print(f"\n=== aioaws: downloading {len(keys)} objects into {base} ===")
+    print(f"\n=== aioaws: downloading listed objects into {base} ===")
 
-    if not keys:
-        print("  (no keys to download)")
-        return
+    s3 = _aioaws_client()
 
-    async with AsyncClient(timeout=60) as http_client:
-        s3 = AioAwsS3Client(
-            http_client,
-            AioAwsS3Config(
-                AWS_ACCESS_KEY_ID,
-                AWS_SECRET_ACCESS_KEY,
-                AWS_REGION,
-                S3_TEST_BUCKET,
-            ),
-        )
+    # The shared httpx client pools connections for all concurrent GETs.
+    done = 0
+    seen_dirs = {base}
 
-        for key in keys:
-            if not _is_downloadable_entry(key):
-                continue
+    async def _fetch(key: str, size: int) -> None:
+        nonlocal done
+        local_path = base / key
 
-            local_path = base / key
-            local_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # inside the try: a conflicting path (e.g. keys `a` and
+            # `a/b` in one bucket) must fail this object, not the worker
+            _ensure_parent(local_path, seen_dirs)
+            # aioaws generates a signed download URL; we fetch via httpx
+            url = s3.signed_download_url(key, max_age=3600)
+            async with _HTTP.stream("GET", url) as resp:
+                resp.raise_for_status()
+                # aiter_raw skips httpx's decoding layer (S3 bodies are
+                # not content-encoded) and aiofiles keeps the disk write
+                # off the event loop thread.
+                async with aiofiles.open(local_path, "wb") as f:
+                    # fileno() is one of the few aiofiles methods that
+                    # is plain synchronous
+                    fd = f.fileno()
+                    if size > 0:
+                        # one extent allocation up front instead of an
+                        # inode extension per chunk
+                        await asyncio.to_thread(
+                            os.posix_fallocate, fd, 0, size
+                        )
+                    async for chunk in resp.aiter_raw(READ_CHUNKSIZE):
+                        await f.write(chunk)
+                    await f.flush()
+                    # bulk downloads shouldn't evict hotter data from
+                    # the page cache
+                    os.posix_fadvise(fd, 0, size, os.POSIX_FADV_DONTNEED)
+            done += 1
+            if done % 100 == 0:
+                print(f"  ... {done} downloaded")
+        except Exception as e:
+            print(f"  FAILED to download {key!r} via aioaws:", e)
 
-            try:
-                # aioaws generates a signed download URL; we fetch via httpx
-                url = s3.signed_download_url(key, max_age=3600)
-                async with http_client.stream("GET", url) as resp:
-                    resp.raise_for_status()
-                    with open(local_path, "wb") as f:
-                        async for chunk in resp.aiter_bytes():
-                            f.write(chunk)
-                print(f"  downloaded: {key} -> {local_path}")
-            except Exception as e:
-                print(f"  FAILED to download {key!r} via aioaws:", e)
+    await _pipeline(entries, _fetch)
+    print(f"  -> aioaws downloaded {done} files into {base}")
 
 
-async def download_obstore_files(keys: List[str], outdir: Path) -> None:
+async def download_obstore_files(
+    entries: AsyncIterator[Tuple[str, int]], outdir: Path
+) -> None:
     base = outdir / "obstore"
     base.mkdir(parents=True, exist_ok=True)
-    print(f"\n=== obstore: downloading {len(keys)} objects into {base} ===")
-
-    if not keys:
-        print("  (no keys to download)")
-        return
+    print(f"\n=== obstore: downloading listed objects into {base} ===")
 
-    store = S3Store(
-        bucket=S3_TEST_BUCKET,
-        prefix="",
-        region=AWS_REGION,
-    )
+    store = _obstore_store()
 
-    for key in keys:
-        if not _is_downloadable_entry(key):
-            continue
+    # One store instance is shared across all concurrent fetches.  Disk
+    # writes go through asyncio.to_thread so they never stall the event
+    # loop while other GETs have data ready.
+    done = 0
+    seen_dirs = {base}
 
+    async def _fetch(key: str, size: int) -> None:
+        nonlocal done
         local_path = base / key
-        local_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            resp = await obs.get_async(store, key)
-            with open(local_path, "wb") as f:
-                async for chunk in resp:
-                    f.write(chunk)
-            print(f"  downloaded: {key} -> {local_path}")
+            # inside the try: a conflicting path (e.g. keys `a` and
+            # `a/b` in one bucket) must fail this object, not the worker
+            _ensure_parent(local_path, seen_dirs)
+            # size comes from the listing, so no HEAD round trip is
+            # needed to pick the strategy or preallocate.
+            if size > MULTIPART_THRESHOLD:
+                # Fetch large objects as parallel 8 MiB ranged GETs and
+                # write each slice at its offset with pwrite.
+                with open(local_path, "wb") as f:
+                    fd = f.fileno()
+                    # allocate real extents up front; one metadata
+                    # journal commit instead of one per extension
+                    await asyncio.to_thread(os.posix_fallocate, fd, 0, size)
+                    sem = asyncio.Semaphore(PART_CONCURRENCY)
+
+                    async def _part(offset: int) -> None:
+                        async with sem:
+                            end = min(offset + MULTIPART_CHUNKSIZE, size)
+                            data = await obs.get_range_async(
+                                store, key, start=offset, end=end
+                            )
+                            await asyncio.to_thread(
+                                os.pwrite, fd, bytes(data), offset
+                            )
+
+                    # TaskGroup, not gather: a failed part must cancel
+                    # its siblings and only raise once they have all
+                    # settled, so no straggler can pwrite into this fd
+                    # after the file closes and the number is reused.
+                    async with asyncio.TaskGroup() as tg:
+                        for offset in range(0, size, MULTIPART_CHUNKSIZE):
+                            tg.create_task(_part(offset))
+                    os.posix_fadvise(fd, 0, size, os.POSIX_FADV_DONTNEED)
+            else:
+                # Drain the whole body first, then hand it to the kernel
+                # in one writev call instead of one write per chunk.
+                resp = await obs.get_async(store, key)
+                chunks = [bytes(chunk) async for chunk in resp]
+                fd = os.open(
+                    local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644
+                )
+                try:
+                    if size > 0:
+                        os.posix_fallocate(fd, 0, size)
+                    if chunks:
+                        await asyncio.to_thread(os.writev, fd, chunks)
+                    os.posix_fadvise(fd, 0, size, os.POSIX_FADV_DONTNEED)
+                finally:
+                    os.close(fd)
+            done += 1
+            if done % 100 == 0:
+                print(f"  ... {done} downloaded")
         except Exception as e:
             print(f"  FAILED to download {key!r} via obstore:", e)
 
+    await _pipeline(entries, _fetch)
+    print(f"  -> obstore downloaded {done} files into {base}")
+
 
 # --------------------------------------------------------------------
 # Main
@@ -471,28 +996,108 @@ async def main() -> None:
         required=True,
         help="Base directory where downloaded files will be stored.",
     )
+    parser.add_argument(
+        "--shallow",
+        action="store_true",
+        help="List only top-level entries (Delimiter='/'); skips subdirectories.",
+    )
+    parser.add_argument(
+        "--skip-auth-check",
+        action="store_true",
+        help="Skip the aioaws/obstore list-of-one probes before downloading.",
+    )
+    parser.add_argument(
+        "--inventory",
+        type=str,
+        default=None,
+        help=(
+            "s3://bucket/path/to/manifest.json of an S3 Inventory; feeds the "
+            "downloaders from the inventory instead of listing the bucket."
+        ),
+    )
     args = parser.parse_args()
 
     max_items = args.limit
     outdir = Path(args.outdir).expanduser().resolve()
     outdir.mkdir(parents=True, exist_ok=True)
 
-    # Auth checks
-    await check_aioboto3_sts()
-    await check_aioaws_s3()
-    await check_obstore_s3()
-
-    # Bucket listings (limited) – collect *file* keys per interface
-    aioboto_keys = await list_aioboto3_contents(max_items=max_items)
-    aioaws_keys = await list_aioaws_contents(max_items=max_items)
-    obstore_keys = await list_obstore_contents(max_items=max_items)
-
-    # Downloads
-    await download_aioboto3_files(aioboto_keys, outdir)
-    await download_aioaws_files(aioaws_keys, outdir)
-    await download_obstore_files(obstore_keys, outdir)
+    try:
+        # Auth checks – the probes hit independent endpoints, so run
+        # them concurrently instead of paying the round trips
+        # back-to-back.  The STS probe is cheap (cached on disk); the
+        # per-interface list probes can be skipped entirely.
+        checks = [check_aioboto3_sts()]
+        if not args.skip_auth_check:
+            checks += [check_aioaws_s3(), check_obstore_s3()]
+        await asyncio.gather(*checks)
+
+        # One S3 client spans both the list and download phases so the
+        # connections warmed up while listing serve the GETs as well.
+        async with s3_client() as s3:
+            if args.inventory:
+                # The inventory is the catalog: skip every LIST path and
+                # feed the same rows to each downloader.
+                rows = await load_inventory(s3, args.inventory)
+                rows = rows[:max_items]
+                if len(rows) > SHARD_THRESHOLD:
+                    aioboto_pipeline = download_aioboto3_sharded(
+                        _as_entries(rows), outdir
+                    )
+                else:
+                    aioboto_pipeline = download_aioboto3_files(
+                        s3, _as_entries(rows), outdir
+                    )
+                await asyncio.gather(
+                    aioboto_pipeline,
+                    download_aioaws_files(_as_entries(rows), outdir),
+                    download_obstore_files(_as_entries(rows), outdir),
+                )
+                return
+
+            # Each listing streams straight into its downloader through
+            # the bounded queue in _pipeline, so transfers start while
+            # pagination is still in flight instead of after the whole
+            # key list has been materialized.  The three pipelines touch
+            # independent SDK state, so they run concurrently and total
+            # wall time is the slowest of the three, not their sum.
+            aioboto_entries = list_aioboto3_contents(
+                s3, max_items=max_items, shallow=args.shallow
+            )
+            if max_items > SHARD_THRESHOLD:
+                aioboto_pipeline = download_aioboto3_sharded(
+                    aioboto_entries, outdir
+                )
+            else:
+                aioboto_pipeline = download_aioboto3_files(
+                    s3, aioboto_entries, outdir
+                )
+            await asyncio.gather(
+                aioboto_pipeline,
+                download_aioaws_files(
+                    list_aioaws_contents(
+                        max_items=max_items, shallow=args.shallow
+                    ),
+                    outdir,
+                ),
+                download_obstore_files(
+                    list_obstore_contents(
+                        max_items=max_items, shallow=args.shallow
+                    ),
+                    outdir,
+                ),
+            )
+    finally:
+        await _HTTP.aclose()
+        await _HTTP1.aclose()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        # libuv-backed loop: cheaper callback dispatch and fewer
+        # epoll_wait round trips per byte on TLS-heavy workloads.
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
 